@@ -0,0 +1,29 @@
+import argparse
+import pprint
+import sys
+from definitions.error import DefinitionError, SchemaError
+from definitions.parser import Parser
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='definitions',
+        description='Load and validate a YAML definition against a schema.')
+    parser.add_argument('schema', help='schema file or string')
+    parser.add_argument('definition', help='definition file or string')
+    parser.add_argument(
+        'overrides', nargs='*', metavar='key=value',
+        help='override values in the definition, e.g. distribution.mean=1')
+    args = parser.parse_args(argv)
+    try:
+        definition = Parser(args.schema)(
+            args.definition, attrdicts=False, overrides=args.overrides)
+    except (DefinitionError, SchemaError) as error:
+        print('error: {}'.format(error), file=sys.stderr)
+        return 1
+    pprint.pprint(definition)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,6 @@
+from definitions.record import Record
+
+
 class AttrDict(dict):
 
     def __getattr__(self, key):
@@ -17,3 +20,48 @@ class DefaultAttrDict(dict):
         if key not in self:
             return None
         return self[key]
+
+
+class FrozenDict(dict):
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('{} is immutable'.format(type(self).__name__))
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FrozenAttrDict(FrozenDict):
+
+    def __getattr__(self, key):
+        if key not in self:
+            raise AttributeError
+        return self[key]
+
+    def __setattr__(self, key, value):
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+
+def use_attrdicts(structure, fallbacks=False):
+    """
+    Recursively replace nested dicts with attribute default dicts.
+    Optionally let them return None for non existing keys instead of
+    raisinig an error.
+    """
+    if isinstance(structure, Record):
+        for key, value in structure.items():
+            setattr(structure, key, use_attrdicts(value, fallbacks))
+        return structure
+    if not isinstance(structure, dict):
+        return structure
+    mapping = {}
+    for key, value in structure.items():
+        value = use_attrdicts(value, fallbacks)
+        mapping[key] = value
+    if fallbacks:
+        return DefaultAttrDict(mapping)
+    else:
+        return AttrDict(mapping)
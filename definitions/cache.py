@@ -0,0 +1,65 @@
+import collections
+import threading
+import time
+
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', 'hits, misses, evictions, maxsize, currsize')
+
+
+class Cache:
+    """
+    Least recently used mapping with a maximum size and optional time to live
+    in seconds for its entries. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        if maxsize < 1:
+            raise ValueError('cache size must be positive')
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                value, expires = self._entries[key]
+                if expires is None or time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._evictions += 1
+            self._misses += 1
+            return default
+
+    def put(self, key, value):
+        expires = None
+        if self._ttl is not None:
+            expires = time.monotonic() + self._ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions,
+                self._maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,6 +1,29 @@
+import collections
+
+
 class SchemaError(Exception):
     pass
 
 
 class DefinitionError(Exception):
     pass
+
+
+class Diagnostic(collections.namedtuple(
+        'Diagnostic',
+        'path, message, schema, value, line, column, filename')):
+    """
+    Error found in a definition, with the schema at its path, the offending
+    value and the position in the source if known.
+    """
+
+    def __new__(cls, path, message, schema=None, value=None, line=None,
+                column=None, filename=None):
+        return super().__new__(
+            cls, path, message, schema, value, line, column, filename)
+
+    def __str__(self):
+        location = [self.filename, self.line, self.column]
+        location = ''.join('{}:'.format(x) for x in location if x is not None)
+        location += ' ' if location else ''
+        return '{}{}: {}'.format(location, self.path, self.message)
@@ -0,0 +1,133 @@
+import collections.abc
+from definitions.attrdict import (
+    AttrDict, DefaultAttrDict, FrozenAttrDict, FrozenDict)
+from definitions.record import Record
+
+try:
+    from multiprocessing import shared_memory as _shm
+except ImportError:
+    _shm = None
+
+
+_SCALARS = (bool, int, float)
+
+
+def freeze(structure, shared_memory=False, min_length=1024):
+    """
+    Return an immutable copy of a parsed definition. Dicts become frozen
+    dicts, lists become tuples and records become frozen records, while
+    instantiated objects are kept. Values that occur multiple times stay
+    shared. Optionally, lists of at least min_length numbers are stored in
+    shared memory blocks that forked or other processes can read without
+    copying. Those blocks must be released by the creating process.
+    """
+    return _freeze(structure, {}, shared_memory, min_length)
+
+
+def release(structure):
+    """Close and unlink the shared memory blocks of a frozen definition."""
+    for sequence in _shared_blocks(structure, set()):
+        sequence.release()
+
+
+class SharedSequence(collections.abc.Sequence):
+    """
+    Read-only view of a list of numbers in a shared memory block. Behaves
+    like a tuple except that slices are copied into tuples.
+    """
+
+    def __init__(self, values):
+        self._block = _shm.ShareableList(values)
+        self._length = len(values)
+
+    @property
+    def name(self):
+        return self._block.shm.name
+
+    def release(self):
+        self._block.shm.close()
+        self._block.shm.unlink()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._block[i] for i in range(
+                *index.indices(self._length)))
+        if not -self._length <= index < self._length:
+            raise IndexError('index out of range')
+        return self._block[index % self._length]
+
+    def __len__(self):
+        return self._length
+
+    def __eq__(self, other):
+        if not isinstance(other, (tuple, SharedSequence)):
+            return NotImplemented
+        return len(self) == len(other) and tuple(self) == tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return tuple, (tuple(self),)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, tuple(self))
+
+
+def _freeze(structure, memo, shared_memory, min_length):
+    if id(structure) in memo:
+        return memo[id(structure)]
+    if isinstance(structure, (AttrDict, DefaultAttrDict)):
+        frozen = FrozenAttrDict(
+            (k, _freeze(v, memo, shared_memory, min_length))
+            for k, v in structure.items())
+    elif type(structure) is dict:
+        frozen = FrozenDict(
+            (k, _freeze(v, memo, shared_memory, min_length))
+            for k, v in structure.items())
+    elif isinstance(structure, Record):
+        frozen = type(structure).frozen()(**{
+            k: _freeze(v, memo, shared_memory, min_length)
+            for k, v in structure.items()})
+    elif type(structure) in (list, tuple):
+        if shared_memory and _is_numeric(structure, min_length):
+            frozen = _share(structure)
+        else:
+            frozen = tuple(
+                _freeze(x, memo, shared_memory, min_length)
+                for x in structure)
+    else:
+        return structure
+    memo[id(structure)] = frozen
+    return frozen
+
+
+def _is_numeric(structure, min_length):
+    if len(structure) < min_length:
+        return False
+    for value in structure:
+        if type(value) not in _SCALARS:
+            return False
+        if type(value) is int and not -2 ** 63 <= value < 2 ** 63:
+            return False
+    return True
+
+
+def _share(structure):
+    if _shm is None:
+        raise RuntimeError('shared memory requires Python 3.8 or later')
+    return SharedSequence(structure)
+
+
+def _shared_blocks(structure, visited):
+    if id(structure) in visited:
+        return
+    visited.add(id(structure))
+    if isinstance(structure, SharedSequence):
+        yield structure
+    elif isinstance(structure, (dict, Record)):
+        for value in structure.values():
+            yield from _shared_blocks(value, visited)
+    elif isinstance(structure, (list, tuple)):
+        for value in structure:
+            yield from _shared_blocks(value, visited)
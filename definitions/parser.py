@@ -1,9 +1,53 @@
 import os
+import re
+import copy
+import functools
+import hashlib
 import sys
 import inspect
+import threading
 import yaml
-from definitions.error import DefinitionError, SchemaError
-from definitions.attrdict import AttrDict, DefaultAttrDict
+from definitions.error import DefinitionError, SchemaError, Diagnostic
+from definitions.attrdict import AttrDict, DefaultAttrDict, use_attrdicts
+from definitions.cache import Cache
+from definitions.freeze import freeze as freeze_structure
+from definitions.record import Record
+from definitions.source import Source
+
+
+_MISSING = object()
+_INVALID = object()
+
+# Compiled schema fragments shared by all parsers, keyed by content hash and
+# stored with the hashes of the fragments they include.
+_FRAGMENTS = {}
+_VALIDATED = set()
+_FRAGMENTS_LOCK = threading.RLock()
+
+
+def clear_fragments():
+    """Forget all compiled schema fragments."""
+    with _FRAGMENTS_LOCK:
+        _FRAGMENTS.clear()
+        _VALIDATED.clear()
+
+
+def _share(instance):
+    return instance
+
+
+class _Context:
+    """
+    State of a single call to the parser, passed through the recursion so
+    that parsers can be used from several threads at once.
+    """
+
+    def __init__(self, source=None, errors=None, records=False):
+        self.source = source
+        self.errors = errors
+        self.records = records
+        self.aliases = {}
+        self.parsed = {}
 
 
 class Candidate:
@@ -27,41 +71,65 @@ class Candidate:
     def kwargs(self):
         return self._kwargs
 
-    def __call__(self, deps=None):
+    def __call__(self, deps=None, fail=None):
+        """
+        Instantiate the candidate and its dependencies. Errors are passed to
+        the fail callback if given, and dependents of objects that failed
+        are skipped.
+        """
         if not self._instance:
             deps = deps or self._dependencies()
-            args = [self._resolve(x, deps) for x in self.args]
-            kwargs = {k: self._resolve(v, deps)
+            args = [self._resolve(x, deps, fail) for x in self.args]
+            kwargs = {k: self._resolve(v, deps, fail)
                       for k, v in self._kwargs.items()}
-            self._instance = self._instantiate(*args, **kwargs)
+            if self._is_invalid((args, kwargs)):
+                return _INVALID
+            self._instance = self._instantiate(fail, *args, **kwargs)
         return self._instance
 
-    def _resolve(self, candidate, deps):
+    def _resolve(self, candidate, deps, fail=None):
         if isinstance(candidate, str) and candidate.startswith('$'):
             name = 'root.' + candidate[1:]
-            if name not in deps:
-                message = 'reference {} with target {} not found'
-                message = message.format(candidate, name)
-                raise DefinitionError(message)
-            return self._resolve(deps[name], deps)
+            target = name
+            while target not in deps:
+                target = self._follow_alias(target, deps)
+                if target is None:
+                    message = 'reference {} with target {} not found'
+                    message = message.format(candidate, name)
+                    return self._fail(fail, message, candidate)
+            return self._resolve(deps[target], deps, fail)
         if isinstance(candidate, dict):
-            return {k: self._resolve(v, deps)
+            return {k: self._resolve(v, deps, fail)
                     for k, v in candidate.items()}
         if isinstance(candidate, (tuple, list)):
-            return [self._resolve(x, deps) for x in candidate]
+            return [self._resolve(x, deps, fail) for x in candidate]
         if isinstance(candidate, Candidate):
-            return candidate(deps)
+            return candidate(deps, fail)
         return candidate
 
-    def _instantiate(self, *args, **kwargs):
+    def _instantiate(self, fail, *args, **kwargs):
         try:
             return self._type(*args, **kwargs)
         except (ValueError, TypeError) as error:
-            message = '{}: cannot instantiate {} from args={} and kwargs={}'
-            message = message.format(
-                self._name, self._type.__name__, args, kwargs)
+            message = 'cannot instantiate {} from args={} and kwargs={}'
+            message = message.format(self._type.__name__, args, kwargs)
             message += '. ' + str(error)
-            raise DefinitionError(message)
+            return self._fail(fail, message, (args, kwargs))
+
+    def _fail(self, fail, message, value):
+        if fail is None:
+            raise DefinitionError('{}: {}'.format(self._name, message))
+        return fail(self._name, None, value, message)
+
+    @classmethod
+    def _is_invalid(cls, value):
+        if value is _INVALID:
+            return True
+        if isinstance(value, dict):
+            return any(cls._is_invalid(x) for x in value.values())
+        if isinstance(value, (tuple, list)):
+            return any(cls._is_invalid(x) for x in value)
+        return False
 
     def __repr__(self):
         string = '<{} name={}, type={}, len(args)={}, kwargs.keys()={}>'
@@ -70,6 +138,24 @@ class Candidate:
             len(self.args), tuple(sorted(self.kwargs.keys())))
         return string
 
+    @staticmethod
+    def _follow_alias(name, deps):
+        """
+        Rewrite a name below a repeated occurrence of an alias to the same
+        name below its first occurrence, which holds the candidates of the
+        children. Return None if the name is not below an alias.
+        """
+        prefix = name
+        while True:
+            match = re.match(r'(.+)(\.[^.\[]+|\[\d*\])$', prefix)
+            if not match:
+                return None
+            prefix = match.group(1)
+            candidate = deps.get(prefix)
+            if isinstance(candidate, Candidate) and \
+                    candidate._type in (_share, copy.deepcopy):
+                return candidate.args[0].name + name[len(prefix):]
+
     def _dependencies(self):
         candidates = list(self._flat_tree(self))
         candidates = [x for x in candidates if isinstance(x, Candidate)]
@@ -77,42 +163,417 @@ class Candidate:
         return candidates
 
     @classmethod
-    def _flat_tree(cls, candidate):
+    def _flat_tree(cls, candidate, visited=None):
+        visited = set() if visited is None else visited
+        if isinstance(candidate, (dict, tuple, list, Candidate)):
+            if id(candidate) in visited:
+                return
+            visited.add(id(candidate))
         if isinstance(candidate, dict):
             for element in candidate.values():
-                yield from cls._flat_tree(element)
+                yield from cls._flat_tree(element, visited)
         if isinstance(candidate, (tuple, list)):
             for element in candidate:
-                yield from cls._flat_tree(element)
+                yield from cls._flat_tree(element, visited)
         if isinstance(candidate, Candidate):
             yield candidate
-            yield from cls._flat_tree(candidate.args)
-            yield from cls._flat_tree(candidate.kwargs)
+            yield from cls._flat_tree(candidate.args, visited)
+            yield from cls._flat_tree(candidate.kwargs, visited)
 
 
 class Parser:
 
-    def __init__(self, schema):
-        schema = self._load(schema)
-        schema = self._use_attrdicts(schema, fallbacks=True)
+    def __init__(self, schema, cache_size=0, cache_ttl=None, cache_copy=True,
+                 max_nodes=1000000):
+        """
+        Optionally cache the results of the most recently parsed definitions.
+        Cached results are either shared between calls or returned as copies
+        of their containers that share the instantiated objects. Definitions
+        that would expand to more than max_nodes values after resolving YAML
+        aliases are rejected.
+        """
+        self._cache = Cache(cache_size, cache_ttl) if cache_size else None
+        self._cache_copy = cache_copy
+        self._max_nodes = max_nodes
+        text, filename = self._read(schema)
+        schema = yaml.load(text, Loader=yaml.FullLoader)
+        schema = use_attrdicts(schema, fallbacks=True)
+        directory = os.path.dirname(filename) if filename else ''
+        schema = self._include(schema, directory, (), [])
         self._validate_schema(schema)
         self._schema = schema
+        self._paths = {}
+        self._subtypes = {}
+        self._scanned = set()
+        self._record_types = {}
+        self._index_schema('root', schema)
+
+    def __call__(self, definition, attrdicts=True, overrides=None,
+                 records=False, freeze=False, shared_memory=False):
+        """
+        Parse a definition file or string. With records, dict mappings with
+        fixed keys result in instances of slotted record classes generated
+        from the schema instead of dicts. With freeze, the result is made
+        of immutable containers, and with shared memory, large lists of
+        numbers are also moved into shared memory blocks.
+        """
+        text, filename = self._read(definition)
+        options = dict(
+            attrdicts=attrdicts, records=records, freeze=freeze,
+            shared_memory=shared_memory)
+        if self._cache is None or shared_memory:
+            # Shared memory blocks are owned by the caller, not the cache.
+            return self._parse_text(text, filename, overrides, **options)
+        digest = hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+        key = (digest, tuple(overrides or ()), tuple(sorted(options.items())))
+        definition = self._cache.get(key, _MISSING)
+        if definition is _MISSING:
+            definition = self._parse_text(
+                text, filename, overrides, **options)
+            self._cache.put(key, definition)
+        if self._cache_copy:
+            definition = self._copy_containers(definition)
+        return definition
+
+    def validate(self, definition, overrides=None):
+        """
+        Parse and instantiate the definition but collect all errors instead
+        of raising the first one. Return a list of diagnostics, which is
+        empty if the definition is valid.
+        """
+        text, filename = self._read(definition)
+        errors = []
+        self._parse_text(text, filename, overrides, errors=errors)
+        return errors
 
-    def __call__(self, definition, attrdicts=True):
-        definition = self._parse('root', self._schema, self._load(definition))
+    def cache_info(self):
+        """Return hits, misses, evictions, maximum and current size."""
+        if self._cache is None:
+            raise RuntimeError('parser has no cache')
+        return self._cache.info()
+
+    def cache_clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _parse_text(self, text, filename, overrides, attrdicts=False,
+                    records=False, freeze=False, shared_memory=False,
+                    errors=None):
+        definition, source = Source.load(text, filename)
+        context = _Context(source, errors, records)
+        definition = self._prepare(context, definition, overrides)
         if isinstance(definition, Candidate):
-            definition = definition()
+            fail = functools.partial(self._fail, context)
+            definition = definition(fail=fail)
         if attrdicts:
-            definition = self._use_attrdicts(definition)
+            definition = use_attrdicts(definition)
+        if freeze or shared_memory:
+            definition = freeze_structure(definition, shared_memory)
         return definition
 
-    def _validate_schema(self, schema):
+    def prepare(self, definition, overrides=None, filename=None):
+        """
+        Parse a definition into a tree of candidates without instantiating
+        them. Calling the returned candidate creates the objects. If a
+        filename is given, the definition is the text already read from it.
+        """
+        if filename is None:
+            text, filename = self._read(definition)
+        else:
+            text = definition
+        definition, source = Source.load(text, filename)
+        return self._prepare(_Context(source), definition, overrides)
+
+    def _prepare(self, context, definition, overrides):
+        if overrides:
+            definition = self._apply_overrides(definition, overrides)
+        context.aliases = self._find_aliases(definition)
+        return self._parse(context, 'root', self._schema, definition)
+
+    def lookup(self, path):
+        """
+        Return the compiled schema node at a path like root.foo[0].bar. List
+        indices are ignored since all elements share the same schema. Nodes
+        from included fragments are shared with other parsers and must not
+        be modified.
+        """
+        key = re.sub(r'\[\d*\]', '[]', path)
+        if key not in self._paths:
+            raise KeyError('no schema at path {}'.format(path))
+        return self._paths[key]
+
+    def paths(self):
+        """Return all paths covered by the schema."""
+        return tuple(self._paths.keys())
+
+    def subtypes(self, base):
+        """
+        Return the known subclasses of a base type used in the schema,
+        including the base type itself.
+        """
+        if base not in self._subtypes:
+            raise KeyError('type {} is not used in the schema'.format(base))
+        return self._subtypes[base]
+
+    def _apply_overrides(self, definition, overrides):
+        """
+        Set values given as key.sub=value strings in the loaded definition.
+        Values are loaded as YAML and later parsed as the schema type at
+        their path.
+        """
+        if definition is None:
+            definition = self._override_target(
+                'root', self._override_default('root'))
+        for override in overrides:
+            if '=' not in override:
+                message = 'override {} must have the form key=value'
+                raise DefinitionError(message.format(override))
+            path, value = override.split('=', 1)
+            name = 'root.' + path.strip()
+            keys = re.findall(r'\.[^.\[\]]+|\[\d+\]', name[4:])
+            if not keys or ''.join(keys) != name[4:]:
+                message = '{}: override has invalid path'.format(name)
+                raise DefinitionError(message)
+            self._ensure_overridable(name, keys)
+            parent = definition
+            for index, key in enumerate(keys):
+                last = index == len(keys) - 1
+                if key.startswith('['):
+                    key = int(key[1:-1])
+                    if not isinstance(parent, list) or key >= len(parent):
+                        message = '{}: override index out of bounds'
+                        raise DefinitionError(message.format(name))
+                elif not isinstance(parent, dict):
+                    message = '{}: cannot override key of non mapping'
+                    raise DefinitionError(message.format(name))
+                else:
+                    key = key[1:]
+                    if not last and parent.get(key) is None:
+                        parent[key] = self._override_default(
+                            'root' + ''.join(keys[:index + 1]))
+                if last:
+                    parent[key] = yaml.load(value, Loader=yaml.FullLoader)
+                    continue
+                path = 'root' + ''.join(keys[:index + 1])
+                parent[key] = self._override_target(path, parent[key])
+                parent = parent[key]
+        return definition
+
+    def _override_default(self, path):
+        """
+        Start an omitted value that an override writes into from the default
+        in the schema, so that only the overridden keys change.
+        """
+        try:
+            schema = self.lookup(path)
+        except KeyError:
+            return {}
+        if not schema or schema.get('default') is None:
+            return {}
+        return copy.deepcopy(schema.default)
+
+    def _override_target(self, path, value):
+        """
+        Copy a dict or list before writing an override into it, since YAML
+        aliases can share it with other keys. Expand a type name given in
+        shorthand form to a mapping so that its arguments can be set.
+        """
+        if isinstance(value, dict):
+            return dict(value)
+        if isinstance(value, list):
+            return list(value)
+        if isinstance(value, str):
+            try:
+                schema = self.lookup(path)
+            except KeyError:
+                return value
+            if schema and 'type' in schema and 'mapping' not in schema \
+                    and 'elements' not in schema:
+                return {'type': value}
+        return value
+
+    def _ensure_overridable(self, name, keys):
+        """
+        The path must be covered by the schema, be nested inside a value
+        without type, or name an additional constructor argument.
+        """
+        for depth in range(len(keys) + 1):
+            parent = 'root' + ''.join(keys[:len(keys) - depth])
+            try:
+                schema = self.lookup(parent)
+            except KeyError:
+                continue
+            if depth == 0 or not schema or 'type' not in schema:
+                return
+            if depth == 1 and 'mapping' not in schema and \
+                    'elements' not in schema:
+                return
+            break
+        message = '{}: override does not match the schema'
+        raise DefinitionError(message.format(name))
+
+    def _find_aliases(self, definition):
+        """
+        Return the dicts and lists that occur more than once in the loaded
+        definition, which happens for YAML aliases. Raise an error if the
+        definition expands to more values than allowed. Both is computed
+        without expanding aliases.
+        """
+        sizes, aliases = {}, {}
+        size = self._count_values(definition, sizes, aliases)
+        if self._max_nodes and size > self._max_nodes:
+            message = 'definition expands to {} values, more than {}'
+            raise DefinitionError(message.format(size, self._max_nodes))
+        return aliases
+
+    @classmethod
+    def _count_values(cls, value, sizes, aliases):
+        if not isinstance(value, (dict, list)):
+            return 1
+        if id(value) in sizes:
+            aliases[id(value)] = value
+            return sizes[id(value)]
+        sizes[id(value)] = 1
+        children = value.values() if isinstance(value, dict) else value
+        size = 1 + sum(cls._count_values(x, sizes, aliases) for x in children)
+        sizes[id(value)] = size
+        return size
+
+    def _fail(self, context, name, schema, value, message):
+        """
+        Raise an error that points to the source position of the value, or
+        record it when collecting errors. Returns a marker that lets
+        dependent objects skip their instantiation.
+        """
         if schema is None:
+            try:
+                schema = self.lookup(name)
+            except KeyError:
+                pass
+        line, column, filename = None, None, None
+        if context.source:
+            line, column = context.source.position(name)
+            filename = context.source.filename
+        error = Diagnostic(
+            name, message, schema, value, line, column, filename)
+        if context.errors is None:
+            raise DefinitionError(str(error))
+        context.errors.append(error)
+        return _INVALID
+
+    def _index_schema(self, path, schema):
+        """
+        Recursively record the schema node at each path and the subclasses
+        available for each type in any of the modules it is used with.
+        """
+        self._paths[path] = schema
+        if not schema:
+            return
+        if 'type' in schema:
+            base = self._find_type(schema.module, schema.type)
+            if (schema.module, base) not in self._scanned:
+                self._scanned.add((schema.module, base))
+                known = self._subtypes.get(base, ())
+                found = self._find_subtypes(schema.module, base)
+                self._subtypes[base] = known + tuple(
+                    x for x in found if x not in known)
+            if base is dict and schema.mapping:
+                record = Record.create(path, schema.mapping.keys())
+                if record:
+                    self._record_types[id(schema)] = record
+        for key, value in (schema.mapping or {}).items():
+            self._index_schema('{}.{}'.format(path, key), value)
+        for key, value in (schema.arguments or {}).items():
+            self._index_schema('{}.{}'.format(path, key), value)
+        if 'elements' in schema:
+            self._index_schema('{}[]'.format(path), schema.elements)
+
+    def _include(self, schema, directory, stack, files):
+        """
+        Recursively replace schemas containing an $include key with the
+        fragment it refers to, updated by the other keys of the schema. The
+        paths and hashes of all included files are appended to files.
+        """
+        if not isinstance(schema, dict) or id(schema) in _VALIDATED:
+            return schema
+        if '$include' in schema:
+            fragment = self._fragment(
+                schema['$include'], directory, stack, files)
+            extra = DefaultAttrDict(
+                (k, v) for k, v in schema.items() if k != '$include')
+            if not extra:
+                return fragment
+            schema = DefaultAttrDict(fragment or {})
+            schema.update(self._include(extra, directory, stack, files))
+            return schema
+        for key in ('arguments', 'mapping'):
+            if isinstance(schema.get(key), dict):
+                for name, value in schema[key].items():
+                    schema[key][name] = self._include(
+                        value, directory, stack, files)
+        if 'elements' in schema:
+            schema['elements'] = self._include(
+                schema['elements'], directory, stack, files)
+        return schema
+
+    def _fragment(self, reference, directory, stack, files):
+        """
+        Load, validate and compile a fragment referenced as path or
+        path#name relative to the including schema. Fragments are cached by
+        content for all parsers and recompiled when a file they include has
+        changed.
+        """
+        with _FRAGMENTS_LOCK:
+            return self._load_fragment(reference, directory, stack, files)
+
+    def _load_fragment(self, reference, directory, stack, files):
+        if not isinstance(reference, str):
+            raise SchemaError('$include must be a path')
+        path, _, name = reference.partition('#')
+        path = os.path.normpath(os.path.join(directory, path))
+        if (path, name) in stack:
+            message = 'circular $include of {}'.format(reference)
+            raise SchemaError(message)
+        try:
+            with open(path, 'rb') as file_:
+                text = file_.read()
+        except OSError as error:
+            message = 'cannot read $include {}: {}'.format(reference, error)
+            raise SchemaError(message)
+        digest = hashlib.sha1(text).hexdigest()
+        files.append((path, digest))
+        key = (digest, name, os.path.dirname(path))
+        if key in _FRAGMENTS:
+            fragment, nested = _FRAGMENTS[key]
+            if all(self._digest(x) == y for x, y in nested):
+                files.extend(nested)
+                return fragment
+            _VALIDATED.discard(id(fragment))
+        nested = []
+        fragment = yaml.load(text, Loader=yaml.FullLoader)
+        if name:
+            if not isinstance(fragment, dict) or name not in fragment:
+                message = 'fragment {} not found in {}'.format(name, path)
+                raise SchemaError(message)
+            fragment = fragment[name]
+        fragment = use_attrdicts(fragment, fallbacks=True)
+        fragment = self._include(
+            fragment, os.path.dirname(path), stack + ((path, name),), nested)
+        self._validate_schema(fragment)
+        _FRAGMENTS[key] = (fragment, tuple(nested))
+        files.extend(nested)
+        if fragment is not None:
+            _VALIDATED.add(id(fragment))
+        return fragment
+
+    def _validate_schema(self, schema):
+        if schema is None or id(schema) in _VALIDATED:
             return
         if not isinstance(schema, dict):
             raise SchemaError('schema must be nested dicts')
         self._validate_type(schema)
         self._validate_exclusives(schema)
+        self._validate_flags(schema)
         self._validate_nested(schema)
 
     def _validate_type(self, schema):
@@ -141,6 +602,14 @@ class Parser:
             message = '{} are mutually exclusive'.format(', '.join(exclusives))
             raise SchemaError(message)
 
+    @staticmethod
+    def _validate_flags(schema):
+        """
+        Boolean keys.
+        """
+        if 'copy' in schema and not isinstance(schema['copy'], bool):
+            raise SchemaError('copy must be true or false')
+
     def _validate_nested(self, schema):
         """
         Recursively check nested schemas.
@@ -158,92 +627,125 @@ class Parser:
         if schema.elements:
             self._validate_schema(schema.elements)
 
-    def _use_attrdicts(self, structure, fallbacks=False):
+    def _copy_containers(self, structure):
         """
-        Recursively replace nested dicts with attribute default dicts.
-        Optionally let them return None for non existing keys instead of
-        raisinig an error.
+        Recursively copy dicts and lists but not the objects they contain.
         """
-        if not isinstance(structure, dict):
-            return structure
-        mapping = {}
-        for key, value in structure.items():
-            value = self._use_attrdicts(value, fallbacks)
-            mapping[key] = value
-        if fallbacks:
-            return DefaultAttrDict(mapping)
-        else:
-            return AttrDict(mapping)
+        if type(structure) in (dict, AttrDict, DefaultAttrDict):
+            return type(structure)(
+                (k, self._copy_containers(v)) for k, v in structure.items())
+        if type(structure) is list:
+            return [self._copy_containers(x) for x in structure]
+        if isinstance(structure, Record):
+            return type(structure)(
+                **{k: self._copy_containers(v) for k, v in structure.items()})
+        return structure
 
-    def _parse(self, name, schema, definition):
+    def _parse(self, context, name, schema, definition):
         has_type = schema and 'type' in schema
         if definition is not None and not has_type:
             return definition
+        if context.aliases and id(definition) in context.aliases:
+            return self._parse_alias(context, name, schema, definition)
+        return self._parse_typed(context, name, schema, definition)
+
+    def _parse_typed(self, context, name, schema, definition):
         if definition is None:
-            return self._parse_default(name, schema)
+            return self._parse_default(context, name, schema)
         if 'mapping' in schema:
-            return self._parse_mapping(name, schema, definition)
+            return self._parse_mapping(context, name, schema, definition)
         if 'elements' in schema:
-            return self._parse_elements(name, schema, definition)
+            return self._parse_elements(context, name, schema, definition)
         if isinstance(definition, dict):
-            return self._parse_arguments(name, schema, definition)
+            return self._parse_arguments(context, name, schema, definition)
         else:
-            return self._parse_single(name, schema, definition)
+            return self._parse_single(context, name, schema, definition)
+
+    def _parse_alias(self, context, name, schema, definition):
+        """
+        Parse values that occur multiple times in the definition only once
+        for each schema. Further occurrences share the instance or get a
+        deep copy of it if the schema sets the copy flag.
+        """
+        key = (id(schema), id(definition))
+        if key not in context.parsed:
+            parsed = self._parse_typed(context, name, schema, definition)
+            context.parsed[key] = parsed
+            return parsed
+        parsed = context.parsed[key]
+        if not isinstance(parsed, Candidate):
+            return parsed
+        if schema.get('copy'):
+            return Candidate(name, copy.deepcopy, parsed)
+        return Candidate(name, _share, parsed)
 
-    def _parse_default(self, name, schema):
+    def _parse_default(self, context, name, schema):
         """
         Parse default from schema or try to construct the type from the schema.
         Raise an error if no default is specified and the type requires
         arguments that have no defaults.
         """
         if schema and 'default' in schema:
-            return self._parse(name, schema, schema.default)
+            return self._parse(context, name, schema, schema.default)
         if schema and 'mapping' in schema:
-            return self._parse(name, schema, {})
+            return self._parse(context, name, schema, {})
         if schema and 'type' in schema:
-            return self._parse_arguments(name, schema, {'type': schema.type})
-        message = '{}: omitted value that has no default'.format(name)
-        raise DefinitionError(message)
+            return self._parse_arguments(
+                context, name, schema, {'type': schema.type})
+        message = 'omitted value that has no default'
+        return self._fail(context, name, schema, None, message)
 
-    def _parse_mapping(self, name, schema, definition):
+    def _parse_mapping(self, context, name, schema, definition):
         """
         Definition should contain a dict used as only argument.
         """
         if not isinstance(definition, dict):
-            message = '{}: mapping must be a dict'.format(name)
-            raise DefinitionError(message)
+            return self._fail(
+                context, name, schema, definition, 'mapping must be a dict')
         mapping = {k: v.default for k, v in schema.mapping.items()}
         mapping.update(definition)
         for key, value in mapping.items():
             if key not in schema.mapping:
-                message = '{}: unexpected mapping key {}'.format(name, key)
-                raise DefinitionError(message)
+                message = 'unexpected mapping key {}'.format(key)
+                mapping[key] = self._fail(
+                    context, name, schema, value, message)
+                continue
             subname = '{}.{}'.format(name, key)
             subschema = schema.mapping[key]
-            mapping[key] = self._parse(subname, subschema, value)
+            mapping[key] = self._parse(context, subname, subschema, value)
+        if context.records and id(schema) in self._record_types:
+            return Candidate(name, self._record_types[id(schema)], **mapping)
         base = self._find_type(schema.module, schema.type)
         return Candidate(name, base, mapping)
 
-    def _parse_elements(self, name, schema, definition):
+    def _parse_elements(self, context, name, schema, definition):
         """
         Definition chould contain a list used as only argument.
         """
         if not isinstance(definition, list):
-            raise DefinitionError('elements must be a list')
-        elements = [self._parse('{}[{}]'.format(name, i), schema.elements, x)
-                    for i, x in enumerate(definition)]
+            return self._fail(
+                context, name, schema, definition, 'elements must be a list')
+        elements = [
+            self._parse(context, '{}[{}]'.format(name, i), schema.elements, x)
+            for i, x in enumerate(definition)]
         base = self._find_type(schema.module, schema.type)
         return Candidate(name, base, elements)
 
-    def _parse_arguments(self, name, schema, definition):
+    def _parse_arguments(self, context, name, schema, definition):
         """
         Definition should be a mapping containing kwargs and possibly a type.
         """
         base = self._find_type(schema.module, schema.type)
         subtype = base
         if 'type' in definition:
-            subtype = self._find_type(schema.module, definition.pop('type'))
-            self._ensure_inherits(name, subtype, base)
+            definition = dict(definition)
+            typename = definition.pop('type')
+            subtype = self._find_type(schema.module, typename)
+            if not self._inherits(subtype, base):
+                message = '{} does not inherit from {}'.format(
+                    getattr(subtype, '__name__', typename),
+                    getattr(base, '__name__', None))
+                return self._fail(context, name, schema, typename, message)
         arguments = {}
         if 'arguments' in schema:
             arguments = {k: v.default for k, v in schema.arguments.items()}
@@ -252,37 +754,41 @@ class Parser:
             subschema = {}
             if 'arguments' in schema:
                 subschema = schema.arguments.get(key, None)
-            arguments[key] = self._parse(key, subschema, value)
+            subname = '{}.{}'.format(name, key)
+            arguments[key] = self._parse(context, subname, subschema, value)
         return Candidate(name, subtype, **arguments)
 
-    def _parse_single(self, name, schema, definition):
+    def _parse_single(self, context, name, schema, definition):
         """
         Definition is a single typename or single constructor argument.
         """
         base = self._find_type(schema.module, schema.get('type', object))
         subtype = self._find_type(schema.module, definition)
-        if inspect.isclass(subtype) and issubclass(subtype, base):
-            return self._parse(name, schema, {'type': definition})
+        if self._inherits(subtype, base):
+            return self._parse(context, name, schema, {'type': definition})
         else:
             return Candidate(name, base, definition)
 
     @staticmethod
-    def _ensure_inherits(name, subtype, base):
-        if inspect.isclass(subtype) and issubclass(subtype, base):
-            return
-        basename = base.__name__ if base else None
-        subtypename = subtype.__name__ if subtype else None
-        message = '{}: {} does not inherit from {}'
-        message = message.format(name, subtypename, basename)
-        raise DefinitionError(message)
+    def _inherits(subtype, base):
+        return inspect.isclass(subtype) and issubclass(subtype, base)
 
     @staticmethod
-    def _load(source):
-        """Load a YAML file or string."""
+    def _read(source):
+        """Read a YAML file or string and return it with the filename."""
         if source and os.path.isfile(source):
             with open(source) as file_:
-                return yaml.load(file_)
-        return yaml.load(source)
+                return file_.read(), source
+        return source, None
+
+    @staticmethod
+    def _digest(path):
+        """Return the hash of a file or None if it cannot be read."""
+        try:
+            with open(path, 'rb') as file_:
+                return hashlib.sha1(file_.read()).hexdigest()
+        except OSError:
+            return None
 
     @staticmethod
     def _find_type(module, name):
@@ -290,13 +796,32 @@ class Parser:
             return name
         if not isinstance(name, str):
             return None
-        scopes = [__builtins__]
-        if module:
-            __import__(module)
-            scopes.insert(0, sys.modules[module])
-        for scope in scopes:
+        for scope in Parser._scopes(module):
             if isinstance(scope, dict) and name in scope:
                 return scope[name]
             if hasattr(scope, name):
                 return getattr(scope, name)
         return None
+
+    @staticmethod
+    def _find_subtypes(module, base):
+        if not inspect.isclass(base):
+            return ()
+        subtypes = [base]
+        for scope in Parser._scopes(module):
+            if not isinstance(scope, dict):
+                scope = vars(scope)
+            for value in scope.values():
+                if not inspect.isclass(value) or value in subtypes:
+                    continue
+                if issubclass(value, base):
+                    subtypes.append(value)
+        return tuple(subtypes)
+
+    @staticmethod
+    def _scopes(module):
+        scopes = [__builtins__]
+        if module:
+            __import__(module)
+            scopes.insert(0, sys.modules[module])
+        return scopes
@@ -0,0 +1,120 @@
+import re
+
+
+# Record classes by schema path and keys, so that unpickling finds them.
+_TYPES = {}
+
+
+class Record:
+    """
+    Base class for records with a fixed set of attributes that are generated
+    from mapping schemas. Slots make attribute access fast and instances
+    small. Records can be converted back using dict(record) or to_dict().
+    Like dicts, records are unhashable unless frozen.
+    """
+
+    __slots__ = ()
+    __hash__ = None
+    _path = None
+    _keys = ()
+    _frozen = False
+
+    def __init__(self, **kwargs):
+        for key in self._keys:
+            if key not in kwargs:
+                raise TypeError('missing record key {}'.format(key))
+            object.__setattr__(self, key, kwargs.pop(key))
+        if kwargs:
+            message = 'unexpected record keys {}'
+            raise TypeError(message.format(', '.join(sorted(kwargs))))
+
+    @classmethod
+    def create(cls, path, keys):
+        """
+        Return the record class for a schema path and keys, or None if a key
+        cannot be used as attribute.
+        """
+        keys = tuple(keys)
+        if (path, keys) in _TYPES:
+            return _TYPES[(path, keys)]
+        for key in keys:
+            if not isinstance(key, str) or not key.isidentifier():
+                return None
+            if key.startswith('__') or hasattr(Record, key):
+                return None
+        name = path.replace('[]', '_items')
+        name = 'Record_' + re.sub(r'\W+', '_', name).strip('_')
+        record = type(name, (Record,), {
+            '__slots__': keys, '__module__': __name__, '_path': path,
+            '_keys': keys})
+        return _TYPES.setdefault((path, keys), record)
+
+    @classmethod
+    def frozen(cls):
+        """Return the immutable variant of the record class."""
+        if cls._frozen:
+            return cls
+        if '_frozen_type' not in cls.__dict__:
+            cls._frozen_type = type(cls.__name__, (cls,), {
+                '__slots__': (), '__module__': __name__, '_frozen': True,
+                '__hash__': lambda self: hash(self.items())})
+        return cls._frozen_type
+
+    def __setattr__(self, key, value):
+        if self._frozen:
+            raise AttributeError('{} is immutable'.format(type(self).__name__))
+        super().__setattr__(key, value)
+
+    def __reduce__(self):
+        return _restore, (self._path, self._keys, self._frozen, self.values())
+
+    def keys(self):
+        return self._keys
+
+    def values(self):
+        return tuple(getattr(self, key) for key in self._keys)
+
+    def items(self):
+        return tuple((key, getattr(self, key)) for key in self._keys)
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self):
+        """Recursively convert to dicts."""
+        return {key: self._to_dict(getattr(self, key)) for key in self}
+
+    @classmethod
+    def _to_dict(cls, value):
+        if isinstance(value, Record):
+            return value.to_dict()
+        if isinstance(value, dict):
+            return {k: cls._to_dict(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._to_dict(x) for x in value]
+        return value
+
+    def __repr__(self):
+        items = ', '.join(
+            '{}={!r}'.format(key, getattr(self, key)) for key in self)
+        return '<{} {}>'.format(type(self).__name__, items)
+
+
+def _restore(path, keys, frozen, values):
+    cls = Record.create(path, keys)
+    if frozen:
+        cls = cls.frozen()
+    return cls(**dict(zip(keys, values)))
@@ -0,0 +1,209 @@
+import argparse
+import hashlib
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import sys
+import yaml
+from definitions.attrdict import use_attrdicts
+from definitions.cache import Cache
+from definitions.error import DefinitionError, SchemaError
+from definitions.freeze import freeze as freeze_structure
+from definitions.parser import Candidate, Parser
+
+
+_HEADER = struct.Struct('!I')
+_ERRORS = {
+    'DefinitionError': DefinitionError, 'SchemaError': SchemaError,
+    'RuntimeError': RuntimeError}
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Parse definitions for registered schemas and send the uninstantiated
+    candidates to clients over a local Unix socket. Schemas are compiled
+    once and the encoded results for recent definitions are cached, so
+    clients only need to instantiate the objects. Each connection is served
+    in its own thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, schemas, cache_size=128):
+        self._parsers = {
+            name: Parser(schema) for name, schema in schemas.items()}
+        self._cache = Cache(cache_size) if cache_size else None
+        super().__init__(path, _Handler)
+
+    def server_bind(self):
+        # Clients send pickled requests, so only the owner may connect. The
+        # socket is created with these permissions rather than changed after
+        # binding to leave no window for other users.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def respond(self, request):
+        """Return the encoded response for a decoded request."""
+        try:
+            return _encode(('ok', self._prepare(**request)))
+        except (DefinitionError, SchemaError) as error:
+            return _encode(('error', type(error).__name__, str(error)))
+        except yaml.YAMLError as error:
+            return _encode(('error', 'DefinitionError', str(error)))
+        except Exception as error:  # pylint: disable=broad-except
+            message = '{}: {}'.format(type(error).__name__, error)
+            return _encode(('error', 'RuntimeError', message))
+
+    def _prepare(self, schema, definition, overrides):
+        if schema not in self._parsers:
+            raise DefinitionError('schema {} is not registered'.format(schema))
+        parser = self._parsers[schema]
+        # Read the file once so that the cached result matches its digest.
+        filename = None
+        if definition and os.path.isfile(definition):
+            filename = definition
+            with open(definition) as file_:
+                definition = file_.read()
+        if self._cache is None:
+            return _encode(parser.prepare(definition, overrides, filename))
+        digest = hashlib.sha1((definition or '').encode()).hexdigest()
+        key = (schema, digest, tuple(overrides or ()))
+        prepared = self._cache.get(key)
+        if prepared is None:
+            prepared = _encode(parser.prepare(definition, overrides, filename))
+            self._cache.put(key, prepared)
+        return prepared
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        while True:
+            request = _receive(self.request)
+            if request is None:
+                return
+            _send(self.request, self.server.respond(_decode(request)))
+
+
+class Client:
+    """
+    Request definitions from a server and instantiate them locally. The
+    types used in the schema must be importable by the client.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._socket = None
+
+    def __call__(self, schema, definition, attrdicts=True, overrides=None,
+                 freeze=False):
+        if definition and os.path.isfile(definition):
+            definition = os.path.abspath(definition)
+        request = dict(
+            schema=schema, definition=definition,
+            overrides=list(overrides or ()))
+        response = _decode(self._request(_encode(request)))
+        if response[0] == 'error':
+            raise _ERRORS[response[1]](response[2])
+        definition = _decode(response[1])
+        if isinstance(definition, Candidate):
+            definition = definition()
+        if attrdicts:
+            definition = use_attrdicts(definition)
+        if freeze:
+            definition = freeze_structure(definition)
+        return definition
+
+    def close(self):
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _request(self, message):
+        if not self._socket:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(self._path)
+        _send(self._socket, message)
+        response = _receive(self._socket)
+        if response is None:
+            self.close()
+            raise ConnectionError('server closed the connection')
+        return response
+
+
+def _encode(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(message):
+    return pickle.loads(message)
+
+
+def _send(connection, message):
+    connection.sendall(_HEADER.pack(len(message)) + message)
+
+
+def _receive(connection):
+    header = _receive_exactly(connection, _HEADER.size)
+    if header is None:
+        return None
+    message = _receive_exactly(connection, _HEADER.unpack(header)[0])
+    if message is None:
+        raise ConnectionError('connection closed during message')
+    return message
+
+
+def _receive_exactly(connection, size):
+    chunks = []
+    while size:
+        chunk = connection.recv(min(size, 1 << 16))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='definitions-server',
+        description='Serve parsed definitions over a Unix socket.')
+    parser.add_argument('socket', help='path of the Unix socket')
+    parser.add_argument(
+        'schemas', nargs='+', metavar='name=schema',
+        help='schema files to register under a name')
+    parser.add_argument(
+        '--cache-size', type=int, default=128,
+        help='number of parsed definitions to keep')
+    args = parser.parse_args(argv)
+    if not all('=' in x for x in args.schemas):
+        parser.error('schemas must have the form name=schema')
+    schemas = dict(x.split('=', 1) for x in args.schemas)
+    server = Server(args.socket, schemas, args.cache_size)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import re
+import yaml
+
+
+class Source:
+    """
+    Positions of values in a composed YAML document. Paths are resolved by
+    walking the node tree on demand, so documents without errors cost no
+    more than loading them.
+    """
+
+    def __init__(self, node, filename=None):
+        self._node = node
+        self._filename = filename
+
+    @classmethod
+    def load(cls, text, filename=None):
+        """Compose and construct a YAML string in a single pass."""
+        loader = yaml.FullLoader(text)
+        try:
+            node = loader.get_single_node()
+            data = None
+            if node is not None:
+                data = loader.construct_document(node)
+        finally:
+            loader.dispose()
+        return data, cls(node, filename)
+
+    @property
+    def filename(self):
+        return self._filename
+
+    def position(self, path):
+        """
+        Return line and column of the value at a path like root.foo[0].bar
+        or of the closest enclosing value, counting from one.
+        """
+        node = self._node
+        if node is None:
+            return None, None
+        for key, index in re.findall(r'\.([^.\[\]]+)|\[(\d+)\]', path):
+            child = None
+            if index and isinstance(node, yaml.SequenceNode):
+                if int(index) < len(node.value):
+                    child = node.value[int(index)]
+            if key and isinstance(node, yaml.MappingNode):
+                for name, value in node.value:
+                    if isinstance(name, yaml.ScalarNode) and name.value == key:
+                        child = value
+            if child is None:
+                break
+            node = child
+        return node.start_mark.line + 1, node.start_mark.column + 1
@@ -89,6 +89,12 @@ if __name__ == '__main__':
         setup_requires=SETUP_REQUIRES,
         install_requires=INSTALL_REQUIRES,
         tests_require=[],
+        entry_points={
+            'console_scripts': [
+                'definitions=definitions.__main__:main',
+                'definitions-server=definitions.server:main',
+            ],
+        },
         cmdclass={
             'test': TestCommand,
             'lint': LintCommand,
@@ -0,0 +1,88 @@
+# pylint: disable=no-self-use
+import pytest
+from definitions import Parser
+from definitions.error import DefinitionError
+
+
+class Counted:
+
+    count = 0
+
+    def __init__(self, value):
+        Counted.count += 1
+        self.value = value
+
+
+class SubCounted(Counted):
+    pass
+
+
+SCHEMA = """
+type: dict
+mapping:
+  first: {type: Counted, module: test.test_alias}
+  shared:
+    type: list
+    elements: {type: Counted, module: test.test_alias}
+  copied:
+    type: list
+    elements: {type: Counted, module: test.test_alias, copy: true}
+"""
+
+DEFINITION = """
+first: &value {type: SubCounted, value: 42}
+shared: [*value, *value, *value]
+copied: [*value, *value]
+"""
+
+
+class TestAlias:
+
+    def test_instantiate_once(self):
+        Counted.count = 0
+        definition = Parser(SCHEMA)(DEFINITION)
+        assert Counted.count == 3
+        assert isinstance(definition.first, SubCounted)
+        assert definition.shared[0] is not definition.first
+        assert definition.shared[1] is definition.shared[0]
+        assert definition.shared[2] is definition.shared[0]
+
+    def test_copy(self):
+        definition = Parser(SCHEMA)(DEFINITION)
+        assert isinstance(definition.copied[1], SubCounted)
+        assert definition.copied[1] is not definition.copied[0]
+        assert definition.copied[1].value == 42
+
+    def test_reference_alias(self):
+        parser = Parser(
+            '{type: dict, mapping: {foo: {type: list}, bar: {type: list}, '
+            'baz: {}}}')
+        definition = parser('{foo: &a [1], bar: *a, baz: $bar}')
+        assert definition.baz is definition.bar
+
+    def test_reference_into_alias(self):
+        parser = Parser(
+            '{type: dict, mapping: {items: {type: list, elements: {type: dict,'
+            ' mapping: {x: {type: int}}}}, d: {type: int}}}')
+        definition = parser("{items: [&o {x: 1}, *o], d: '$items[1].x'}")
+        assert definition.d == 1
+        assert definition['items'][1] is definition['items'][0]
+
+    def test_untyped_alias(self):
+        definition = Parser('')('{foo: &a [1, 2], bar: *a}')
+        assert definition.foo == definition.bar == [1, 2]
+
+    def test_expansion_bomb(self):
+        definition = 'a0: &a0 [1, 1, 1, 1, 1, 1, 1, 1, 1, 1]'
+        for index in range(1, 30):
+            aliases = ', '.join(['*a{}'.format(index - 1)] * 10)
+            definition += '\na{}: &a{} [{}]'.format(index, index, aliases)
+        with pytest.raises(DefinitionError):
+            Parser('')(definition)
+
+    def test_node_budget(self):
+        parser = Parser('', max_nodes=5)
+        parser('[1, 2, 3]')
+        with pytest.raises(DefinitionError):
+            parser('[1, 2, 3, [4, 5]]')
+        Parser('', max_nodes=None)('[1, 2, 3, [4, 5]]')
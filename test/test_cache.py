@@ -0,0 +1,87 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import time
+import pytest
+from definitions import Parser
+from definitions.cache import Cache
+from test.fixtures import *
+
+
+class TestCache:
+
+    def test_disabled(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        with pytest.raises(RuntimeError):
+            parser.cache_info()
+
+    def test_hits(self):
+        parser = Parser(filename('schema/readme_example.yaml'), cache_size=2)
+        first = parser(filename('definition/readme_example.yaml'))
+        second = parser(filename('definition/readme_example.yaml'))
+        assert second.constraints[1].angle == 120
+        assert first.cost is second.cost
+        info = parser.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_key_content_and_flags(self):
+        parser = Parser('{type: dict, mapping: {foo: {}}}', cache_size=8)
+        assert parser('{foo: 1}').foo == 1
+        assert parser('{foo: 2}').foo == 2
+        assert parser('{foo: 1}', overrides=['foo=3']).foo == 3
+        assert isinstance(parser('{foo: 1}', attrdicts=False), dict)
+        assert parser.cache_info().misses == 4
+        assert parser.cache_info().hits == 0
+
+    def test_copy(self):
+        parser = Parser('{type: dict, mapping: {foo: {}}}', cache_size=1)
+        first = parser('{foo: [1, 2]}')
+        first.foo.append(3)
+        second = parser('{foo: [1, 2]}')
+        assert second.foo == [1, 2]
+        assert second is not first
+
+    def test_shared(self):
+        parser = Parser(
+            '{type: dict, mapping: {foo: {}}}', cache_size=1,
+            cache_copy=False)
+        assert parser('{foo: 1}') is parser('{foo: 1}')
+
+    def test_clear(self):
+        parser = Parser('', cache_size=1)
+        parser('42')
+        parser.cache_clear()
+        assert parser.cache_info().currsize == 0
+
+
+class TestLeastRecentlyUsed:
+
+    def test_evict_oldest(self):
+        cache = Cache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a') == 1
+        cache.put('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.info().evictions == 1
+
+    def test_none_value(self):
+        cache = Cache(1)
+        cache.put('a', None)
+        assert cache.get('a', 42) is None
+        assert cache.get('b', 42) == 42
+
+    def test_ttl(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        cache = Cache(2, ttl=10)
+        cache.put('a', 1)
+        now[0] += 5
+        assert cache.get('a') == 1
+        now[0] += 10
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            Cache(0)
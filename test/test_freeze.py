@@ -0,0 +1,137 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import copy
+import multiprocessing
+import pickle
+import pytest
+from definitions import Parser
+from definitions.attrdict import FrozenAttrDict, FrozenDict
+from definitions.freeze import freeze, release
+from definitions.record import Record
+from test.fixtures import *
+from test.test_readme import Gaussian
+
+
+class TestFrozenDict:
+
+    def test_immutable(self):
+        mapping = FrozenAttrDict(foo=1)
+        assert mapping.foo == mapping['foo'] == 1
+        with pytest.raises(TypeError):
+            mapping['foo'] = 2
+        with pytest.raises(TypeError):
+            mapping.update(foo=2)
+        with pytest.raises(TypeError):
+            del mapping['foo']
+        with pytest.raises(AttributeError):
+            mapping.foo = 2
+
+    def test_copy_and_pickle(self):
+        mapping = FrozenDict(foo=[1])
+        assert copy.deepcopy(mapping) == mapping
+        assert pickle.loads(pickle.dumps(mapping)) == mapping
+        assert type(pickle.loads(pickle.dumps(mapping))) is FrozenDict
+
+
+class TestFreeze:
+
+    def test_example(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = parser(
+            filename('definition/readme_example.yaml'), freeze=True)
+        assert isinstance(definition, FrozenAttrDict)
+        assert isinstance(definition.constraints, tuple)
+        assert definition.constraints[1].angle == 120
+        assert isinstance(definition.distribution, Gaussian)
+        with pytest.raises(TypeError):
+            definition['backup'] = True
+
+    def test_nested(self):
+        definition = Parser('')('{foo: [{bar: [1, 2]}]}', freeze=True)
+        assert definition == {'foo': ({'bar': (1, 2)},)}
+        assert isinstance(definition.foo[0], FrozenDict)
+
+    def test_records(self):
+        parser = Parser('{type: dict, mapping: {foo: {}}}')
+        definition = parser('{foo: [1]}', records=True, freeze=True)
+        assert isinstance(definition, Record)
+        assert definition.foo == (1,)
+        with pytest.raises(AttributeError):
+            definition.foo = 2
+        assert copy.deepcopy(definition) == definition
+
+    def test_keep_shared(self):
+        inner = [1, 2]
+        frozen = freeze({'foo': inner, 'bar': inner})
+        assert frozen['foo'] is frozen['bar']
+
+    def test_cache_shares_frozen(self):
+        parser = Parser('', cache_size=1)
+        assert parser('[1]', freeze=True) is parser('[1]', freeze=True)
+
+
+def _read_shared(values, queue):
+    queue.put(sum(values[i] for i in range(len(values))))
+
+
+class TestSharedMemory:
+
+    def test_small_lists(self):
+        frozen = freeze({'foo': [1.0] * 10}, shared_memory=True)
+        assert frozen['foo'] == (1.0,) * 10
+
+    def test_numeric_lists(self):
+        values = list(range(2000))
+        definition = Parser('')(str(values), shared_memory=True)
+        try:
+            assert len(definition) == 2000
+            assert definition[1999] == 1999
+            assert not isinstance(definition, (list, tuple))
+        finally:
+            release(definition)
+
+    def test_read_only_view(self):
+        values = [float(x) for x in range(2000)]
+        frozen = freeze({'foo': values}, shared_memory=True)
+        try:
+            view = frozen['foo']
+            assert view == tuple(values)
+            assert view[-1] == 1999.0
+            assert view[10:13] == (10.0, 11.0, 12.0)
+            assert list(view) == values
+            with pytest.raises(TypeError):
+                view[0] = 99  # pylint: disable=unsupported-assignment-operation
+            with pytest.raises(IndexError):
+                view[2000]  # pylint: disable=pointless-statement
+            assert pickle.loads(pickle.dumps(view)) == tuple(values)
+        finally:
+            release(frozen)
+
+    def test_bypass_cache(self):
+        parser = Parser('', cache_size=4)
+        first = parser(str(list(range(2000))), shared_memory=True)
+        release(first)
+        second = parser(str(list(range(2000))), shared_memory=True)
+        try:
+            assert second[5] == 5
+            assert parser.cache_info().currsize == 0
+        finally:
+            release(second)
+
+    def test_mixed_lists(self):
+        frozen = freeze([1] * 2000 + ['foo'], shared_memory=True)
+        assert isinstance(frozen, tuple)
+
+    def test_fork(self):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            pytest.skip('fork is not available')
+        context = multiprocessing.get_context('fork')
+        frozen = freeze({'foo': list(range(2000))}, shared_memory=True)
+        try:
+            queue = context.Queue()
+            process = context.Process(
+                target=_read_shared, args=(frozen['foo'], queue))
+            process.start()
+            assert queue.get(timeout=10) == sum(range(2000))
+            process.join()
+        finally:
+            release(frozen)
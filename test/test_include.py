@@ -0,0 +1,84 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import os
+import tempfile
+import pytest
+from definitions import Parser
+from definitions.parser import clear_fragments
+from definitions.error import SchemaError
+from test.fixtures import *
+from test.test_readme import Constraint, Gaussian, SquaredError
+
+
+class TestInclude:
+
+    def test_example(self):
+        parser = Parser(filename('schema/include.yaml'))
+        definition = parser(filename('definition/readme_example.yaml'))
+        assert isinstance(definition.cost, SquaredError)
+        assert all(isinstance(x, Constraint) for x in definition.constraints)
+        assert definition.constraints[1].angle == 120
+        assert isinstance(definition.distribution, Gaussian)
+        assert definition.distribution.mean == 0
+
+    def test_shared_between_parsers(self):
+        first = Parser(filename('schema/include.yaml'))
+        second = Parser(filename('schema/include.yaml'))
+        assert first.lookup('root.cost') is second.lookup('root.cost')
+        assert first.lookup('root.distribution.mean') is \
+            second.lookup('root.distribution.mean')
+
+    def test_update_keys(self):
+        schema = (
+            '{type: dict, mapping: {distribution: '
+            '{$include: %s, default: Gaussian}}}')
+        schema %= filename('schema/fragment/readme.yaml#distribution')
+        parser = Parser(schema)
+        assert parser.lookup('root.distribution').default == 'Gaussian'
+        assert parser.lookup('root.distribution.mean').type == 'float'
+        fragment = Parser(filename('schema/include.yaml'))
+        assert fragment.lookup('root.distribution').default is None
+
+    def test_nested_change(self):
+        directory = tempfile.mkdtemp()
+        outer = os.path.join(directory, 'outer.yaml')
+        inner = os.path.join(directory, 'inner.yaml')
+        schema = os.path.join(directory, 'schema.yaml')
+        with open(schema, 'w') as file_:
+            file_.write('{type: dict, mapping: {foo: {$include: outer.yaml}}}')
+        with open(outer, 'w') as file_:
+            file_.write('{type: dict, mapping: {bar: {$include: inner.yaml}}}')
+        with open(inner, 'w') as file_:
+            file_.write('{type: int}')
+        try:
+            assert Parser(schema).lookup('root.foo.bar').type == 'int'
+            with open(inner, 'w') as file_:
+                file_.write('{type: str}')
+            assert Parser(schema).lookup('root.foo.bar').type == 'str'
+        finally:
+            for path in (schema, outer, inner):
+                os.remove(path)
+            os.rmdir(directory)
+
+    def test_clear(self):
+        first = Parser(filename('schema/include.yaml'))
+        clear_fragments()
+        second = Parser(filename('schema/include.yaml'))
+        assert first.lookup('root.cost') is not second.lookup('root.cost')
+        assert first.lookup('root.cost') == second.lookup('root.cost')
+
+    def test_missing_file(self):
+        with pytest.raises(SchemaError):
+            Parser('{$include: %s}' % filename('schema/fragment/none.yaml'))
+
+    def test_missing_name(self):
+        with pytest.raises(SchemaError):
+            Parser('{$include: %s}' % filename(
+                'schema/fragment/readme.yaml#none'))
+
+    def test_circular(self):
+        with pytest.raises(SchemaError):
+            Parser(filename('schema/fragment/circular.yaml'))
+
+    def test_invalid_fragment(self):
+        with pytest.raises(SchemaError):
+            Parser('{$include: %s}' % filename('definition/list.yaml'))
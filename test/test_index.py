@@ -0,0 +1,57 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import pytest
+from definitions import Parser
+from test.fixtures import *
+from test.test_alias import Counted
+from test.test_readme import Distribution, Gaussian
+
+
+class TestIndex:
+
+    def test_lookup_mapping(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        assert parser.lookup('root').type == 'dict'
+        assert parser.lookup('root.cost').type == 'Cost'
+        assert parser.lookup('root.backup').default is False
+
+    def test_lookup_arguments(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        assert parser.lookup('root.distribution.mean').type == 'float'
+        assert parser.lookup('root.distribution.mean').default == 0
+
+    def test_lookup_elements(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        assert parser.lookup('root.constraints[]').type == 'Constraint'
+        assert parser.lookup('root.constraints[1]').type == 'Constraint'
+        assert parser.lookup('root.constraints[0].angle').type == 'int'
+
+    def test_lookup_missing(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        with pytest.raises(KeyError):
+            parser.lookup('root.foo')
+        with pytest.raises(KeyError):
+            parser.lookup('root.cost.foo')
+
+    def test_lookup_empty_schema(self):
+        parser = Parser('')
+        assert parser.lookup('root') is None
+        assert parser.paths() == ('root',)
+
+    def test_subtypes(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        assert set(parser.subtypes(Distribution)) == {Distribution, Gaussian}
+        assert parser.subtypes(Distribution)[0] is Distribution
+        assert bool in parser.subtypes(int)
+
+    def test_subtypes_modules(self):
+        parser = Parser(
+            '{type: dict, mapping: {a: {type: object, module: test.test_alias},'
+            ' b: {type: object, module: test.test_readme}}}')
+        assert parser.subtypes(object)[0] is object
+        assert Counted in parser.subtypes(object)
+        assert Gaussian in parser.subtypes(object)
+
+    def test_subtypes_unused(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        with pytest.raises(KeyError):
+            parser.subtypes(str)
@@ -0,0 +1,124 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import pytest
+import yaml
+from definitions import Parser
+from definitions.__main__ import main
+from definitions.error import DefinitionError
+from test.fixtures import *
+from test.test_readme import Gaussian
+
+
+class TestOverrides:
+
+    def test_mapping(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = parser(
+            filename('definition/readme_example.yaml'),
+            overrides=['backup=true'])
+        assert definition.backup is True
+
+    def test_arguments(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = parser(
+            filename('definition/readme_example.yaml'),
+            overrides=['distribution.mean=1', 'distribution.variance=3'])
+        assert isinstance(definition.distribution, Gaussian)
+        assert definition.distribution.mean == 1
+        assert definition.distribution.variance == 3
+
+    def test_elements(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = parser(
+            filename('definition/readme_example.yaml'),
+            overrides=['constraints[1].angle=90'])
+        assert definition.constraints[0].angle == 70
+        assert definition.constraints[1].angle == 90
+
+    def test_coerce_type(self):
+        parser = Parser('{type: dict, mapping: {foo: {type: str}}}')
+        assert parser('{foo: bar}', overrides=['foo=42']).foo == '42'
+        assert parser('{foo: bar}', overrides=['foo=[1, 2]']).foo == '[1, 2]'
+
+    def test_empty_definition(self):
+        parser = Parser(filename('schema/reference_nested.yaml'))
+        definition = parser('', overrides=['reference.nested=13'])
+        assert definition.foo.nested == 13
+
+    def test_unknown_key(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        with pytest.raises(DefinitionError):
+            parser(filename('definition/readme_example.yaml'),
+                   overrides=['foo=42'])
+
+    def test_index_out_of_bounds(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        with pytest.raises(DefinitionError):
+            parser(filename('definition/readme_example.yaml'),
+                   overrides=['constraints[2].angle=90'])
+
+    def test_alias_not_shared(self):
+        parser = Parser('')
+        definition = parser('{a: &x {m: [1]}, b: *x}', overrides=['a.m[0]=2'])
+        assert definition.a.m == [2]
+        assert definition.b.m == [1]
+
+    def test_shorthand_type(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = parser(
+            'cost: Cost\nconstraints: []\ndistribution: Gaussian',
+            overrides=['distribution.mean=1', 'distribution.variance=2'])
+        assert isinstance(definition.distribution, Gaussian)
+        assert definition.distribution.mean == 1
+        assert definition.distribution.variance == 2
+
+    def test_omitted_default(self):
+        parser = Parser(
+            '{type: dict, mapping: {dist: {type: Distribution, '
+            'module: test.test_readme, default: {type: Gaussian, variance: 3},'
+            ' arguments: {mean: {type: float, default: 0}}}}}')
+        definition = parser('', overrides=['dist.mean=1'])
+        assert isinstance(definition.dist, Gaussian)
+        assert definition.dist.mean == 1
+        assert definition.dist.variance == 3
+
+    def test_omitted_shorthand_default(self):
+        parser = Parser(
+            '{type: dict, mapping: {dist: {type: Distribution, '
+            'module: test.test_readme, default: Gaussian, '
+            'arguments: {variance: {type: float}}}}}')
+        definition = parser('', overrides=['dist.mean=1', 'dist.variance=2'])
+        assert isinstance(definition.dist, Gaussian)
+        assert definition.dist.variance == 2
+
+    def test_no_python_calls(self):
+        with pytest.raises(yaml.YAMLError):
+            Parser('')('{foo: 1}', overrides=[
+                'foo=!!python/object/apply:os.getpid []'])
+        with pytest.raises(yaml.YAMLError):
+            Parser('!!python/object/apply:os.getpid []')
+
+    def test_untyped(self):
+        assert Parser('')('', overrides=['foo.bar=42']) == {
+            'foo': {'bar': 42}}
+
+    def test_malformed(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        with pytest.raises(DefinitionError):
+            parser(filename('definition/readme_example.yaml'),
+                   overrides=['backup'])
+        with pytest.raises(DefinitionError):
+            parser(filename('definition/readme_example.yaml'),
+                   overrides=['backup]=true'])
+
+
+class TestCommandLine:
+
+    def test_overrides(self, capsys):
+        schema = filename('schema/two_lists.yaml')
+        assert main([schema, '{foo: [1], bar: [2]}', 'bar[0]=3']) == 0
+        assert capsys.readouterr().out.strip() == "{'bar': [3], 'foo': [1]}"
+
+    def test_error(self, capsys):
+        schema = filename('schema/two_lists.yaml')
+        assert main([schema, '{foo: [1], bar: [2]}', 'baz=3']) == 1
+        assert 'baz' in capsys.readouterr().err
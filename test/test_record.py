@@ -0,0 +1,113 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import pickle
+import pytest
+from definitions import Parser
+from definitions.attrdict import AttrDict
+from definitions.record import Record
+from test.fixtures import *
+from test.test_readme import Gaussian
+
+
+class TestRecord:
+
+    def test_create(self):
+        Point = Record.create('Point', ['x', 'y'])
+        point = Point(x=1, y=2)
+        assert (point.x, point.y) == (1, 2)
+        assert dict(point) == {'x': 1, 'y': 2}
+        assert point == Point(x=1, y=2)
+        assert not hasattr(point, '__dict__')
+
+    def test_pickle(self):
+        parser = Parser(filename('schema/reference_nested.yaml'))
+        definition = parser('reference: {nested: 42}', records=True)
+        restored = pickle.loads(pickle.dumps(definition))
+        assert type(restored) is type(definition)
+        assert restored == definition
+        frozen = parser('reference: {nested: 42}', records=True, freeze=True)
+        restored = pickle.loads(pickle.dumps(frozen))
+        assert type(restored) is type(frozen)
+        with pytest.raises(AttributeError):
+            restored.foo = None
+
+    def test_hash(self):
+        Point = Record.create('Point', ['x', 'y'])
+        with pytest.raises(TypeError):
+            hash(Point(x=1, y=2))
+        Frozen = Point.frozen()
+        assert hash(Frozen(x=1, y=2)) == hash(Frozen(x=1, y=2))
+        assert len({Frozen(x=1, y=2), Frozen(x=1, y=2)}) == 1
+
+    def test_invalid_keys(self):
+        assert Record.create('Foo', ['foo-bar']) is None
+        assert Record.create('Foo', ['keys']) is None
+        assert Record.create('Foo', [42]) is None
+
+    def test_missing_and_unexpected(self):
+        Point = Record.create('Point', ['x', 'y'])
+        with pytest.raises(TypeError):
+            Point(x=1)
+        with pytest.raises(TypeError):
+            Point(x=1, y=2, z=3)
+        with pytest.raises(AttributeError):
+            Point(x=1, y=2).z = 3
+
+
+class TestRecordResults:
+
+    def test_example(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = parser(
+            filename('definition/readme_example.yaml'), records=True)
+        assert isinstance(definition, Record)
+        assert isinstance(definition.distribution, Gaussian)
+        assert definition.constraints[1].angle == 120
+        assert definition.backup is False
+        assert set(definition.to_dict()) == {
+            'cost', 'constraints', 'distribution', 'backup'}
+
+    def test_nested(self):
+        schema, definition = '{}', '{}'
+        for _ in range(3):
+            schema = schema.replace('{}', '{type: dict, mapping: {key: {}}}')
+            definition = definition.replace('{}', '{key: {}}')
+        definition = Parser(schema)(definition, records=True)
+        assert isinstance(definition.key, Record)
+        assert isinstance(definition.key.key.key, AttrDict)
+        assert definition.to_dict() == {'key': {'key': {'key': {}}}}
+
+    def test_class_per_schema_node(self):
+        parser = Parser(filename('schema/two_lists.yaml'))
+        first = parser('{foo: [1], bar: [2]}', records=True)
+        second = parser('{foo: [3], bar: [4]}', records=True)
+        assert type(first) is type(second)
+        assert type(first).__name__ == 'Record_root'
+        assert Parser(filename('schema/two_lists.yaml'))(
+            '{foo: [], bar: []}', records=True).__class__ is type(first)
+
+    def test_element_class_name(self):
+        element = Record.create('root[]', ['foo'])
+        assert element.__name__ == 'Record_root_items'
+        assert element is not Record.create('root', ['foo'])
+        nested = Record.create('root.foo[][]', ['foo'])
+        assert nested.__name__ == 'Record_root_foo_items_items'
+
+    def test_reference(self):
+        parser = Parser(filename('schema/reference_nested.yaml'))
+        definition = parser('reference: {nested: 42}', records=True)
+        assert definition.foo.nested == 42
+
+    def test_disabled(self):
+        parser = Parser('{type: dict, mapping: {foo: {}}}')
+        assert isinstance(parser('{foo: 1}'), AttrDict)
+
+    def test_unusable_keys(self):
+        parser = Parser('{type: dict, mapping: {foo-bar: {}}}')
+        definition = parser('{foo-bar: 1}', records=True)
+        assert isinstance(definition, AttrDict)
+
+    def test_cached_copy(self):
+        parser = Parser('{type: dict, mapping: {foo: {}}}', cache_size=1)
+        first = parser('{foo: [1]}', records=True)
+        first.foo.append(2)
+        assert parser('{foo: [1]}', records=True).foo == [1]
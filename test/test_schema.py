@@ -50,3 +50,11 @@ class TestSchema:
         Parser('{type: str}')
         with pytest.raises(SchemaError):
             Parser('{type: Foo}')
+
+    def test_copy_bool(self):
+        Parser('{type: int, copy: true}')
+        Parser('{type: int, copy: false}')
+        with pytest.raises(SchemaError):
+            Parser('{type: int, copy: maybe}')
+        with pytest.raises(SchemaError):
+            Parser('{type: int, copy: 1}')
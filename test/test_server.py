@@ -0,0 +1,117 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import os
+import socket
+import stat
+import tempfile
+import threading
+import pytest
+from definitions.attrdict import FrozenAttrDict
+from definitions.error import DefinitionError
+from test.fixtures import *
+from test.test_readme import Gaussian
+
+server = pytest.importorskip('definitions.server')
+if not hasattr(socket, 'AF_UNIX'):
+    pytest.skip('unix sockets are not available', allow_module_level=True)
+
+
+@pytest.fixture
+def address():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'definitions.sock')
+    instance = server.Server(path, {
+        'example': filename('schema/readme_example.yaml'),
+        'lists': filename('schema/two_lists.yaml'),
+    }, cache_size=4)
+    thread = threading.Thread(
+        target=instance.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield path
+    instance.shutdown()
+    instance.server_close()
+    thread.join()
+    os.rmdir(directory)
+
+
+class TestServer:
+
+    def test_example(self, address):
+        with server.Client(address) as client:
+            definition = client(
+                'example', filename('definition/readme_example.yaml'))
+        assert isinstance(definition.distribution, Gaussian)
+        assert definition.distribution.variance == 2.5
+        assert definition.constraints[1].angle == 120
+
+    def test_cached_instances_are_fresh(self, address):
+        definition = filename('definition/readme_example.yaml')
+        with server.Client(address) as client:
+            first = client('example', definition)
+            second = client('example', definition)
+        assert first.distribution is not second.distribution
+
+    def test_references_and_overrides(self, address):
+        with server.Client(address) as client:
+            definition = client(
+                'lists', "{foo: [1, 2], bar: ['$foo[1]']}",
+                overrides=['foo[1]=3'], freeze=True)
+        assert isinstance(definition, FrozenAttrDict)
+        assert definition.bar == (3,)
+
+    def test_errors(self, address):
+        with server.Client(address) as client:
+            with pytest.raises(DefinitionError):
+                client('lists', '{foo: [bar]}')
+            with pytest.raises(DefinitionError):
+                client('unknown', '{}')
+            with pytest.raises(DefinitionError):
+                client('lists', '{foo: [')
+            assert client('lists', '{foo: [1]}', attrdicts=False) == {
+                'foo': [1], 'bar': []}
+
+    def test_unexpected_errors(self, address):
+        with server.Client(address) as client:
+            with pytest.raises(RuntimeError):
+                client('lists', '{foo: [1]}', overrides=[1])
+            assert client('lists', '{foo: [1]}').foo == [1]
+
+    def test_concurrent_clients(self, address):
+        definition = filename('definition/readme_example.yaml')
+        with server.Client(address) as first, server.Client(address) as second:
+            assert first('example', definition).distribution.variance == 2.5
+            assert second('example', definition).distribution.variance == 2.5
+            assert first('lists', '{foo: [1]}').foo == [1]
+
+    def test_file_read_once(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'definition.yaml')
+        with open(path, 'w') as file_:
+            file_.write('{foo: [1]}')
+        instance = server.Server(
+            os.path.join(directory, 'definitions.sock'),
+            {'lists': filename('schema/two_lists.yaml')})
+        parser = instance._parsers['lists']  # pylint: disable=protected-access
+        prepare = parser.prepare
+
+        def changing(*args):
+            with open(path, 'w') as file_:
+                file_.write('{foo: [2]}')
+            return prepare(*args)
+
+        def request():
+            response = server._decode(instance.respond(
+                dict(schema='lists', definition=path, overrides=[])))
+            return server._decode(response[1])()
+
+        try:
+            parser.prepare = changing
+            assert request()['foo'] == [1]
+            parser.prepare = prepare
+            assert request()['foo'] == [2]
+        finally:
+            instance.server_close()
+            os.remove(path)
+            os.rmdir(directory)
+
+    def test_permissions(self, address):
+        assert stat.S_IMODE(os.stat(address).st_mode) == 0o600
@@ -0,0 +1,65 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import pytest
+import yaml
+from definitions import Parser
+from definitions.error import DefinitionError
+from definitions.source import Source
+from test.fixtures import *
+
+
+class TestSource:
+
+    def test_load(self):
+        data, source = Source.load('foo:\n  bar: [1, 2]\n', 'file.yaml')
+        assert data == {'foo': {'bar': [1, 2]}}
+        assert source.filename == 'file.yaml'
+
+    def test_no_python_calls(self):
+        definition = '!!python/object/apply:os.getpid []'
+        with pytest.raises(yaml.YAMLError):
+            Source.load(definition)
+        with pytest.raises(yaml.YAMLError):
+            Parser('')(definition)
+
+    def test_position(self):
+        _, source = Source.load('foo:\n  bar: [1, 2]\nbaz: 3\n')
+        assert source.position('root') == (1, 1)
+        assert source.position('root.foo') == (2, 3)
+        assert source.position('root.foo.bar') == (2, 8)
+        assert source.position('root.foo.bar[1]') == (2, 12)
+        assert source.position('root.baz') == (3, 6)
+
+    def test_closest_enclosing(self):
+        _, source = Source.load('foo:\n  bar: [1, 2]\n')
+        assert source.position('root.foo.qux') == (2, 3)
+        assert source.position('root.foo.bar[5]') == (2, 8)
+
+    def test_empty(self):
+        data, source = Source.load('')
+        assert data is None
+        assert source.position('root.foo') == (None, None)
+
+
+class TestErrorPosition:
+
+    def test_string(self):
+        parser = Parser('{type: list, elements: {type: int}}')
+        with pytest.raises(DefinitionError) as info:
+            parser('- 1\n- foo\n')
+        assert str(info.value).startswith('2:3: root[1]: ')
+
+    def test_file(self):
+        schema = filename('schema/readme_intro.yaml')
+        definition = filename('definition/readme_intro.yaml')
+        with pytest.raises(DefinitionError) as info:
+            Parser(schema)(definition, overrides=['key3.argument2=foo'])
+        message = '{}:5:14: root.key3.argument2: '.format(definition)
+        assert str(info.value).startswith(message)
+
+    def test_validate(self):
+        definition = filename('definition/readme_intro.yaml')
+        parser = Parser(filename('schema/readme_intro.yaml'))
+        errors = parser.validate(definition, overrides=['key4.argument2=foo'])
+        assert len(errors) == 1
+        assert errors[0].filename == definition
+        assert (errors[0].line, errors[0].column) == (9, 14)
@@ -0,0 +1,113 @@
+# pylint: disable=no-self-use, wildcard-import, unused-wildcard-import
+import threading
+import pytest
+from definitions import Parser
+from definitions.error import DefinitionError
+from test.fixtures import *
+
+
+DEFINITION = """\
+cost: Constraint
+constraints:
+- angle: 70
+- angle: foo
+distribution:
+  type: Gaussian
+unknown: 42
+"""
+
+
+class TestValidate:
+
+    def test_valid(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = filename('definition/readme_example.yaml')
+        assert parser.validate(definition) == []
+
+    def test_all_errors(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        errors = parser.validate(DEFINITION)
+        paths = sorted(error.path for error in errors)
+        assert paths == [
+            'root', 'root.constraints[1].angle', 'root.cost',
+            'root.distribution']
+
+    def test_diagnostic_fields(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        errors = {x.path: x for x in parser.validate(DEFINITION)}
+        error = errors['root.constraints[1].angle']
+        assert error.schema.type == 'int'
+        assert (error.line, error.column) == (4, 10)
+        assert 'foo' in str(error.value)
+        assert str(error).startswith('4:10: root.constraints[1].angle: ')
+        error = errors['root']
+        assert error.message == 'unexpected mapping key unknown'
+        assert error.value == 42
+        error = errors['root.distribution']
+        assert (error.line, error.column) == (6, 3)
+
+    def test_omitted(self):
+        parser = Parser('{type: dict, mapping: {foo: {}, bar: {}}}')
+        errors = parser.validate('\n{}')
+        assert sorted(x.path for x in errors) == ['root.bar', 'root.foo']
+        assert errors[0].message == 'omitted value that has no default'
+        assert (errors[0].line, errors[0].column) == (2, 1)
+
+    def test_inherits(self):
+        parser = Parser('{type: Distribution, module: test.test_readme}')
+        errors = parser.validate('{type: Constraint, mean: 0}')
+        assert len(errors) == 1
+        assert errors[0].value == 'Constraint'
+        assert 'does not inherit' in errors[0].message
+
+    def test_inherits_skips_instantiation(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        errors = parser.validate(
+            'cost: Cost\nconstraints: []\n'
+            'distribution: {type: Constraint, angle: 3}')
+        assert [x.path for x in errors] == ['root.distribution']
+        assert 'does not inherit' in errors[0].message
+
+    def test_reference(self):
+        parser = Parser(filename('schema/reference_dict.yaml'))
+        errors = parser.validate('{foo: $missing, reference: 1}')
+        assert [x.path for x in errors] == ['root']
+        assert '$missing' in errors[0].message
+
+    def test_skip_dependents(self):
+        parser = Parser(filename('schema/date.yaml'))
+        errors = parser.validate('{year: foo, month: 1, day: 1}')
+        assert [x.path for x in errors] == ['root.year']
+
+    def test_raise_first(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        with pytest.raises(DefinitionError):
+            parser(DEFINITION)
+        assert parser.validate(DEFINITION)
+
+
+class TestThreads:
+
+    def test_validate_and_parse_concurrently(self):
+        parser = Parser(filename('schema/readme_example.yaml'))
+        definition = filename('definition/readme_example.yaml')
+        failures = []
+
+        def validate():
+            for _ in range(50):
+                if len(parser.validate(DEFINITION)) != 4:
+                    failures.append('validate')
+
+        def parse():
+            for _ in range(50):
+                try:
+                    parser(definition)
+                except Exception as error:  # pylint: disable=broad-except
+                    failures.append(error)
+
+        threads = [threading.Thread(target=x) for x in (validate, parse) * 2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not failures